@@ -0,0 +1,530 @@
+import hashlib
+import io
+import os
+import pickle
+import re
+import sys
+import tempfile
+import unicodedata
+import xml.etree.ElementTree as ET
+import zipfile
+from pathlib import Path
+
+# -------------------------------------------------------------------
+# ÍNDICE DEL CORPUS (.asc, .EQU y .pdsprj)
+# -------------------------------------------------------------------
+# Recorre digitales/ y teoría_de_circuitos/ una sola vez, parsea cada
+# esquemático de LTSpice, ecuación de Win-Logic-Lab y proyecto de Proteus,
+# y guarda los resultados en un caché en disco. En las siguientes corridas
+# sólo se vuelven a parsear los archivos que cambiaron.
+#
+# Uso:
+#   python herramientas/indice_corpus.py        -> resumen del corpus
+#   python herramientas/indice_corpus.py TP3 9  -> entradas del ejercicio 9 del TP3
+
+RAIZ = Path(__file__).resolve().parent.parent
+CARPETAS = ("digitales", "teoría_de_circuitos")
+CACHE = RAIZ / ".cache" / "indice_corpus.pickle"
+
+# Si cambia el formato de lo que devuelven los parsers, subir este número
+# para que el caché viejo se descarte entero.
+VERSION_CACHE = 2
+
+EXTENSIONES = {".asc": "asc", ".equ": "equ", ".pdsprj": "pdsprj"}
+PATRON_EJERCICIO = re.compile(r"EJ(\d+)", re.IGNORECASE)
+# Los números de ejercicio se repiten entre trabajos prácticos (hay un EJ3
+# en el TP1 y otro en el TP3), así que cada entrada se ubica por su TP.
+PATRON_TP = re.compile(r"^TP\s*(\d+)", re.IGNORECASE)
+
+
+# -------------------------------------------------------------------
+# ESQUEMÁTICOS DE LTSPICE (.asc)
+# -------------------------------------------------------------------
+
+# Posición de los pines de cada símbolo básico, relativa al origen del
+# símbolo y sin rotar (tomado de los .asy que vienen con LTSpice).
+PINES_SIMBOLO = {
+    "res": ((16, 16), (16, 96)),
+    "cap": ((16, 0), (16, 64)),
+    "ind": ((16, 16), (16, 96)),
+    "voltage": ((0, 16), (0, 96)),
+    "current": ((0, 0), (0, 80)),
+}
+
+# Multiplicadores de SPICE. LTSpice guarda el micro como 'µ' (0xB5 en
+# Latin-1), así que también se acepta esa letra.
+SUFIJOS = {
+    "meg": 1e6, "f": 1e-15, "p": 1e-12, "n": 1e-9, "u": 1e-6, "µ": 1e-6,
+    "m": 1e-3, "k": 1e3, "g": 1e9, "t": 1e12,
+}
+PATRON_VALOR = re.compile(r"^([-+]?\d*\.?\d+(?:e[-+]?\d+)?)(meg|[fpnuµmkgt])?", re.IGNORECASE)
+
+
+def valor_spice(texto):
+    """Convierte un valor como '4.7K', '40µ' o '20m' a float (None si no se puede)."""
+    m = PATRON_VALOR.match(texto.strip())
+    if not m:
+        return None
+    numero = float(m.group(1))
+    sufijo = m.group(2)
+    if sufijo:
+        numero *= SUFIJOS[sufijo.lower()]
+    return numero
+
+
+def _rotar(x, y, rotacion):
+    # LTSpice rota en sentido horario sobre la pantalla (el eje Y apunta
+    # hacia abajo) y la M espeja en X antes de rotar.
+    if rotacion.startswith("M"):
+        x = -x
+    giro = int(rotacion[1:]) % 360
+    if giro == 90:
+        return -y, x
+    if giro == 180:
+        return -x, -y
+    if giro == 270:
+        return y, -x
+    return x, y
+
+
+class _Nodos:
+    """Union-find simple sobre coordenadas del esquemático."""
+
+    def __init__(self):
+        self.padre = {}
+
+    def buscar(self, p):
+        self.padre.setdefault(p, p)
+        while self.padre[p] != p:
+            self.padre[p] = self.padre[self.padre[p]]
+            p = self.padre[p]
+        return p
+
+    def unir(self, a, b):
+        ra, rb = self.buscar(a), self.buscar(b)
+        if ra != rb:
+            self.padre[ra] = rb
+
+
+def _sobre_cable(p, cable):
+    (x1, y1), (x2, y2) = cable
+    if x1 == x2 == p[0]:
+        return min(y1, y2) <= p[1] <= max(y1, y2)
+    if y1 == y2 == p[1]:
+        return min(x1, x2) <= p[0] <= max(x1, x2)
+    return False
+
+
+# Cantidad mínima de campos (contando la palabra clave) de cada línea del .asc
+CAMPOS_ASC = {"WIRE": 5, "FLAG": 4, "SYMBOL": 5, "SYMATTR": 2}
+
+
+def parsear_asc(datos):
+    """Parsea un esquemático de LTSpice y arma su netlist."""
+    cables, etiquetas, componentes, directivas = [], [], [], []
+    actual = None
+    for linea in datos.decode("latin-1").splitlines():
+        partes = linea.split()
+        if not partes:
+            continue
+        clave = partes[0]
+        if len(partes) < CAMPOS_ASC.get(clave, 0):
+            raise ValueError("Línea %s incompleta: %r" % (clave, linea))
+        if clave == "WIRE":
+            x1, y1, x2, y2 = map(int, partes[1:5])
+            cables.append(((x1, y1), (x2, y2)))
+        elif clave == "FLAG":
+            etiquetas.append(((int(partes[1]), int(partes[2])), partes[3]))
+        elif clave == "SYMBOL":
+            actual = {
+                "simbolo": partes[1],
+                "origen": (int(partes[2]), int(partes[3])),
+                "rotacion": partes[4],
+                "nombre": None,
+                "valor": None,
+            }
+            componentes.append(actual)
+        elif clave == "SYMATTR" and actual is not None:
+            texto = linea.split(None, 2)[2] if len(partes) > 2 else ""
+            if partes[1] == "InstName":
+                actual["nombre"] = texto
+            elif partes[1] == "Value":
+                actual["valor"] = texto
+                actual["valor_num"] = valor_spice(texto)
+        elif clave == "TEXT":
+            texto = linea.split(None, 5)[5] if len(partes) > 5 else ""
+            if texto.startswith("!"):
+                directivas.append(texto[1:])
+
+    # --- Conectividad: extremos de cables, pines y etiquetas ---
+    nodos = _Nodos()
+    for a, b in cables:
+        nodos.unir(a, b)
+    puntos = {p for cable in cables for p in cable}
+
+    for comp in componentes:
+        ox, oy = comp["origen"]
+        pines = []
+        for px, py in PINES_SIMBOLO.get(comp["simbolo"], ()):
+            rx, ry = _rotar(px, py, comp["rotacion"])
+            pines.append((ox + rx, oy + ry))
+        comp["pines"] = pines
+        puntos.update(pines)
+    puntos.update(p for p, _ in etiquetas)
+
+    # Un punto que cae en el medio de un cable también queda conectado.
+    for p in puntos:
+        for cable in cables:
+            if _sobre_cable(p, cable):
+                nodos.unir(p, cable[0])
+
+    nombres = {}
+    for p, etiqueta in etiquetas:
+        nombres[nodos.buscar(p)] = etiqueta
+    numerados = {}
+
+    def nombre_nodo(p):
+        raiz = nodos.buscar(p)
+        if raiz in nombres:
+            return nombres[raiz]
+        if raiz not in numerados:
+            numerados[raiz] = "N%03d" % (len(numerados) + 1)
+        return numerados[raiz]
+
+    netlist = []
+    for comp in componentes:
+        comp["nodos"] = [nombre_nodo(p) for p in comp["pines"]]
+        netlist.append((comp["nombre"], *comp["nodos"], comp["valor"]))
+
+    return {
+        "componentes": componentes,
+        "cables": cables,
+        "etiquetas": etiquetas,
+        "directivas": directivas,
+        "netlist": netlist,
+    }
+
+
+# -------------------------------------------------------------------
+# ECUACIONES DE WIN-LOGIC-LAB (.EQU)
+# -------------------------------------------------------------------
+# Formato: "BOOLEAN EQUATION", la expresión, y las variables con la salida
+# al final (ej: "ABCDZ"). En la expresión '•' es AND, '+' es OR y [X] es
+# la negación de X.
+
+class _Expresion:
+    """Parser recursivo que arma la expresión como un DAG sin nodos repetidos.
+
+    Cada nodo es una tupla ('var', letra), ('not', i), ('and', (i, j, ...))
+    u ('or', (i, j, ...)), donde los enteros son índices a nodos anteriores.
+    """
+
+    def __init__(self, texto):
+        self.texto = texto.replace(" ", "")
+        self.pos = 0
+        self.nodos = []
+        self.ids = {}
+
+    def _nodo(self, nodo):
+        if nodo not in self.ids:
+            self.ids[nodo] = len(self.nodos)
+            self.nodos.append(nodo)
+        return self.ids[nodo]
+
+    def _ver(self):
+        return self.texto[self.pos] if self.pos < len(self.texto) else ""
+
+    def _esperar(self, caracter):
+        if self._ver() != caracter:
+            raise ValueError("Se esperaba %r en la posición %d de %r"
+                             % (caracter, self.pos, self.texto))
+        self.pos += 1
+
+    def parsear(self):
+        raiz = self._or()
+        if self.pos != len(self.texto):
+            raise ValueError("Sobra texto en la posición %d de %r" % (self.pos, self.texto))
+        return raiz
+
+    def _or(self):
+        terminos = [self._and()]
+        while self._ver() == "+":
+            self.pos += 1
+            terminos.append(self._and())
+        return terminos[0] if len(terminos) == 1 else self._nodo(("or", tuple(terminos)))
+
+    def _and(self):
+        factores = [self._factor()]
+        while self._ver() == "•":
+            self.pos += 1
+            factores.append(self._factor())
+        return factores[0] if len(factores) == 1 else self._nodo(("and", tuple(factores)))
+
+    def _factor(self):
+        c = self._ver()
+        if c == "(":
+            self.pos += 1
+            nodo = self._or()
+            self._esperar(")")
+            return nodo
+        if c == "[":
+            self.pos += 1
+            nodo = self._or()
+            self._esperar("]")
+            return self._nodo(("not", nodo))
+        if c.isalpha():
+            self.pos += 1
+            return self._nodo(("var", c))
+        raise ValueError("Carácter inesperado %r en la posición %d de %r" % (c, self.pos, self.texto))
+
+
+def evaluar(nodos, raiz, valores):
+    """Evalúa el DAG de una ecuación para un dict {variable: bool}."""
+    resultados = []
+    for tipo, arg in nodos[:raiz + 1]:
+        if tipo == "var":
+            resultados.append(valores[arg])
+        elif tipo == "not":
+            resultados.append(not resultados[arg])
+        elif tipo == "and":
+            resultados.append(all(resultados[i] for i in arg))
+        else:
+            resultados.append(any(resultados[i] for i in arg))
+    return resultados[raiz]
+
+
+def parsear_equ(datos):
+    """Parsea una ecuación de Win-Logic-Lab y calcula su tabla de verdad."""
+    lineas = [l.strip() for l in datos.decode("cp1252").splitlines() if l.strip()]
+    if len(lineas) < 3 or lineas[0].upper() != "BOOLEAN EQUATION":
+        raise ValueError("No es un archivo BOOLEAN EQUATION")
+    expresion = _Expresion(lineas[1])
+    raiz = expresion.parsear()
+    entradas, salida = lineas[2][:-1], lineas[2][-1]
+
+    # Tabla de verdad como máscara de bits: el bit i vale 1 si la salida es
+    # verdadera para la combinación i (la primera variable es el bit más alto).
+    tabla = 0
+    for i in range(2 ** len(entradas)):
+        valores = {v: bool(i >> (len(entradas) - 1 - k) & 1) for k, v in enumerate(entradas)}
+        if evaluar(expresion.nodos, raiz, valores):
+            tabla |= 1 << i
+
+    return {
+        "expresion": lineas[1],
+        "entradas": entradas,
+        "salida": salida,
+        "nodos": expresion.nodos,
+        "raiz": raiz,
+        "tabla": tabla,
+    }
+
+
+# -------------------------------------------------------------------
+# PROYECTOS DE PROTEUS (.pdsprj)
+# -------------------------------------------------------------------
+# Un .pdsprj es un zip con PROJECT.XML (metadatos) y el diseño en ROOT.DSN
+# (binario). Sólo se extraen los metadatos.
+
+def parsear_pdsprj(datos):
+    with zipfile.ZipFile(io.BytesIO(datos)) as archivo:
+        miembros = {info.filename: info.file_size for info in archivo.infolist()}
+        proyecto = ET.fromstring(archivo.read("PROJECT.XML"))
+    marca = proyecto.find("TIMESTAMP")
+    return {
+        "miembros": miembros,
+        "timestamp": dict(marca.attrib) if marca is not None else {},
+        "scripts": [s.text for s in proyecto.iterfind("SCRIPTS/STRING")],
+    }
+
+
+# -------------------------------------------------------------------
+# ÍNDICE Y CACHÉ
+# -------------------------------------------------------------------
+
+def _clave(ruta):
+    # Ruta relativa en formato POSIX y normalizada a NFC, para que
+    # "teoría" sea la misma clave venga de Linux, Windows o macOS (NFD).
+    return unicodedata.normalize("NFC", str(ruta).replace(os.sep, "/"))
+
+
+def _tp(relativa):
+    """Trabajo práctico al que pertenece un archivo ('TP1', 'TP3', ...) o None."""
+    for parte in relativa.parts:
+        m = PATRON_TP.match(parte)
+        if m:
+            return "TP%d" % int(m.group(1))
+    return None
+
+
+def _normalizar_tp(tp):
+    # Acepta 3, "3", "tp3" o "TP3"
+    texto = str(tp).strip().upper()
+    return texto if texto.startswith("TP") else "TP" + texto
+
+
+def _parsear(tipo, datos):
+    # Siempre desde los bytes ya leídos, así el resultado corresponde al
+    # mismo contenido del que se calculó el hash.
+    if tipo == "asc":
+        return parsear_asc(datos)
+    if tipo == "equ":
+        return parsear_equ(datos)
+    return parsear_pdsprj(datos)
+
+
+class IndiceCorpus:
+    """Índice de los ejercicios del repositorio con caché incremental en disco.
+
+    Cada entrada se guarda bajo su ruta relativa junto con el mtime, el
+    tamaño y el hash del contenido. Si mtime y tamaño no cambiaron se usa lo
+    guardado sin leer el archivo; si cambiaron pero el hash es el mismo,
+    tampoco se vuelve a parsear.
+    """
+
+    def __init__(self, raiz=RAIZ, cache=CACHE):
+        self.raiz = Path(raiz)
+        self.cache = Path(cache)
+        self.entradas = {}
+        self.por_numero = {}
+        self.parseados = 0
+
+    def _archivos(self):
+        for carpeta in CARPETAS:
+            base = self.raiz / carpeta
+            if not base.is_dir():
+                continue
+            for directorio, _, nombres in os.walk(base):
+                for nombre in nombres:
+                    tipo = EXTENSIONES.get(os.path.splitext(nombre)[1].lower())
+                    if tipo:
+                        yield Path(directorio) / nombre, tipo
+
+    def _leer_cache(self):
+        try:
+            with open(self.cache, "rb") as f:
+                version, entradas = pickle.load(f)
+        except Exception:
+            # Caché ausente, roto o de otra versión del código: se rearma.
+            return {}
+        return entradas if version == VERSION_CACHE else {}
+
+    def _guardar_cache(self):
+        # Se escribe a un temporal y se reemplaza, así una corrida cortada a
+        # la mitad nunca deja un caché roto.
+        self.cache.parent.mkdir(parents=True, exist_ok=True)
+        fd, temporal = tempfile.mkstemp(dir=self.cache.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((VERSION_CACHE, self.entradas), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporal, self.cache)
+        except BaseException:
+            os.unlink(temporal)
+            raise
+
+    def actualizar(self):
+        """Sincroniza el índice con los archivos en disco. Devuelve self."""
+        anteriores = self._leer_cache()
+        entradas = {}
+        cambios = False
+        self.parseados = 0
+
+        for ruta, tipo in self._archivos():
+            relativa = ruta.relative_to(self.raiz)
+            clave = _clave(relativa)
+            info = ruta.stat()
+            vieja = anteriores.get(clave)
+            if vieja and vieja["mtime"] == info.st_mtime_ns and vieja["tamano"] == info.st_size:
+                entradas[clave] = vieja
+                continue
+
+            datos = ruta.read_bytes()
+            digest = hashlib.blake2b(datos, digest_size=16).hexdigest()
+            cambios = True
+            if vieja and vieja["hash"] == digest:
+                vieja = dict(vieja, mtime=info.st_mtime_ns, tamano=info.st_size)
+                entradas[clave] = vieja
+                continue
+
+            numero = PATRON_EJERCICIO.search(ruta.name)
+            try:
+                contenido, error = _parsear(tipo, datos), None
+            except (ValueError, KeyError, zipfile.BadZipFile, ET.ParseError) as e:
+                contenido, error = None, str(e)
+            entradas[clave] = {
+                "ruta": clave,
+                "tipo": tipo,
+                "tp": _tp(relativa),
+                "ejercicio": int(numero.group(1)) if numero else None,
+                "mtime": info.st_mtime_ns,
+                "tamano": info.st_size,
+                "hash": digest,
+                "datos": contenido,
+                "error": error,
+            }
+            self.parseados += 1
+
+        self.entradas = entradas
+        if cambios or entradas.keys() != anteriores.keys():
+            self._guardar_cache()
+
+        self.por_numero = {}
+        for clave in sorted(entradas):
+            entrada = entradas[clave]
+            if entrada["ejercicio"] is not None:
+                numero = (entrada["tp"], entrada["ejercicio"])
+                self.por_numero.setdefault(numero, []).append(entrada)
+        return self
+
+    def ejercicio(self, tp, numero, tipo=None):
+        """Entradas del ejercicio 'numero' del trabajo práctico 'tp' (ej: "TP3" o 3).
+
+        Opcionalmente se filtran por tipo ('asc', 'equ', 'pdsprj').
+        """
+        entradas = self.por_numero.get((_normalizar_tp(tp), int(numero)), [])
+        if tipo is not None:
+            entradas = [e for e in entradas if e["tipo"] == tipo]
+        return entradas
+
+    def __getitem__(self, ruta):
+        return self.entradas[_clave(ruta)]
+
+    def __len__(self):
+        return len(self.entradas)
+
+
+def cargar_indice(raiz=RAIZ, cache=CACHE):
+    """Atajo para obtener un índice ya sincronizado con el disco."""
+    return IndiceCorpus(raiz, cache).actualizar()
+
+
+# -------------------------------------------------------------------
+# USO DESDE LA LÍNEA DE COMANDOS
+# -------------------------------------------------------------------
+
+if __name__ == "__main__":
+    indice = cargar_indice()
+    if len(sys.argv) == 2:
+        print("Uso: python herramientas/indice_corpus.py TP3 9")
+    elif len(sys.argv) > 2:
+        for entrada in indice.ejercicio(sys.argv[1], sys.argv[2]):
+            print(entrada["ruta"])
+            datos = entrada["datos"]
+            if entrada["error"]:
+                print("   Error:", entrada["error"])
+            elif entrada["tipo"] == "asc":
+                for fila in datos["netlist"]:
+                    print("  ", " ".join(str(c) for c in fila))
+            elif entrada["tipo"] == "equ":
+                print("   %s = %s  (tabla: %s)" % (datos["salida"], datos["expresion"],
+                                                   format(datos["tabla"], "#x")))
+            else:
+                print("   Archivos:", ", ".join(sorted(datos["miembros"])))
+    else:
+        tipos = {}
+        for entrada in indice.entradas.values():
+            tipos[entrada["tipo"]] = tipos.get(entrada["tipo"], 0) + 1
+        print("Archivos indexados: %d (%s)" % (len(indice), ", ".join(
+            "%s: %d" % par for par in sorted(tipos.items()))))
+        print("Parseados en esta corrida: %d" % indice.parseados)
+        print("Caché:", indice.cache)
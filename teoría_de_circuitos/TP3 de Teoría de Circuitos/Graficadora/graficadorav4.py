@@ -0,0 +1,544 @@
+import numpy as np
+import matplotlib.pyplot as plt
+import sys
+from pathlib import Path
+
+import instrumentacion
+from instrumentacion import etapa
+
+# -------------------------------------------------------------------
+# PARÁMETROS CONFIGURABLES POR EL USUARIO
+# -------------------------------------------------------------------
+
+# --- Modo de análisis ---
+# "tiempo": ciclo de carga/flotación/descarga (igual que la v3_4)
+# "ac":     respuesta en frecuencia (Bode) del circuito RC
+# "ambos":  las dos cosas
+# También se puede elegir al ejecutar: python graficadorav4.py ac
+MODO = "tiempo"
+
+# --- Parámetros Generales del Circuito ---
+Vf = 30.0      # Tensión de la fuente de carga (en Voltios)
+Vi = 0.0       # Tensión inicial del capacitor al empezar el ciclo (en Voltios)
+C = 2.0/1000000     # Capacitancia (en Faradios, ej: 100uF = 0.0001)
+
+# --- Parámetros de la FASE DE CARGA ---
+R_carga = 5000.0  # Resistencia de carga (en Ohmios, ej: 10k = 10000)
+
+# --- Parámetros de la FASE DE DESCARGA ---
+R_descarga = 2000.0 # Resistencia de descarga (en Ohmios, ej: 20k = 20000)
+
+# --- Parámetros de Transición (TIEMPOS) ---
+t_fin_carga = 0.1   # Tiempo en segundos para terminar la carga.
+t_inicio_descarga = 0.2 # Tiempo en segundos para empezar la descarga.
+
+# --- Parámetros del ANÁLISIS AC ---
+N_PUNTOS_AC = 100000  # Cantidad de frecuencias (espaciadas logarítmicamente)
+F_MIN = None          # Frecuencia mínima en Hz (None = fc / 1000, fc = 1/(2πτ) del circuito)
+F_MAX = None          # Frecuencia máxima en Hz (None = fc * 1000)
+# Esquemático de LTSpice a analizar en lugar del RC de carga, ej:
+# ASC = "../EJ1_eq.asc". Se toma la primera fuente como entrada. Los
+# esquemáticos que tienen la llave dibujada abierta no se pueden analizar.
+ASC = None
+NODO_SALIDA = None    # Nodo de salida del .asc (None = el del FLAG o el del capacitor)
+
+# Cantidad máxima de puntos que se dibujan por curva. El cálculo usa todos
+# los puntos; esto sólo evita que matplotlib dibuje cientos de miles.
+MAX_PUNTOS_GRAFICO = 5000
+
+# --- Salida ---
+# GUARDAR: además de mostrar las ventanas, guarda cada una como PNG en la
+# carpeta salida/ (ignorada por git).
+# PERFILAR: mide cada etapa y deja perfil_graficadora.json y
+# perfil_graficadora.folded (para flame graph) junto a este archivo.
+# También se activan con: python graficadorav4.py tiempo --guardar --perfilar
+GUARDAR = False
+PERFILAR = False
+PERFILAR_MEMORIA = False  # Cuenta bytes reservados por etapa (más lento)
+
+
+# -------------------------------------------------------------------
+# CÁLCULOS DEL CICLO COMPLETO (DOMINIO DEL TIEMPO)
+# -------------------------------------------------------------------
+
+def validar_parametros(C, R_carga, R_descarga, t_fin_carga, t_inicio_descarga):
+    if t_fin_carga > t_inicio_descarga:
+        raise ValueError("El tiempo de fin de carga no puede ser mayor que el tiempo de inicio de descarga.")
+    if C <= 0 or R_carga <= 0 or R_descarga <= 0:
+        raise ValueError("La capacitancia y las resistencias tienen que ser mayores que cero.")
+    # R·C puede dar 0 o infinito aunque R y C sean válidos (ej: 1e-300 · 1e-300)
+    T_carga, T_descarga = R_carga * C, R_descarga * C
+    if not (0 < T_carga < np.inf and 0 < T_descarga < np.inf
+            and np.isfinite(t_inicio_descarga + 5 * T_descarga)):
+        raise ValueError("Las constantes de tiempo R·C tienen que ser números finitos mayores que cero.")
+
+
+def calcular_ciclo(Vf, Vi, C, R_carga, R_descarga, t_fin_carga, t_inicio_descarga, n_puntos=2000):
+    """Calcula vc, ic y vr para las fases de carga, flotación y descarga."""
+    with etapa("parametros"):
+        validar_parametros(C, R_carga, R_descarga, t_fin_carga, t_inicio_descarga)
+
+    T_carga = R_carga * C
+    T_descarga = R_descarga * C
+    t_final = t_inicio_descarga + 5 * T_descarga
+    t = np.linspace(0, t_final, n_puntos)
+
+    # --- Fase de Carga: vc, ic y vr = (Vf - Vi) * exp(-t/T) ---
+    with etapa("fase_carga"):
+        exp_carga = np.exp(-t / T_carga)
+        vc_fase_carga = Vf + (Vi - Vf) * exp_carga
+        ic_fase_carga = ((Vf - Vi) / R_carga) * exp_carga
+        vr_fase_carga = (Vf - Vi) * exp_carga
+        V_fin_carga = Vf + (Vi - Vf) * np.exp(-t_fin_carga / T_carga)
+
+    # --- Fase de Descarga: vc, ic y vr = -vc ---
+    with etapa("fase_descarga"):
+        vc_fase_descarga = V_fin_carga * np.exp(-(t - t_inicio_descarga) / T_descarga)
+        ic_fase_descarga = -vc_fase_descarga / R_descarga
+
+    # --- Combinar las fases (en la flotación ic = vr = 0 y vc se mantiene) ---
+    with etapa("seleccion"):
+        en_carga = t <= t_fin_carga
+        en_flotacion = t <= t_inicio_descarga
+        vc_total = np.where(en_carga, vc_fase_carga,
+                            np.where(en_flotacion, V_fin_carga, vc_fase_descarga))
+        ic_total = np.where(en_carga, ic_fase_carga,
+                            np.where(en_flotacion, 0.0, ic_fase_descarga))
+        vr_total = np.where(en_carga, vr_fase_carga,
+                            np.where(en_flotacion, 0.0, -vc_fase_descarga))
+
+    return {"t": t, "vc": vc_total, "ic": ic_total, "vr": vr_total, "V_fin_carga": V_fin_carga}
+
+
+# -------------------------------------------------------------------
+# ANÁLISIS AC (RESPUESTA EN FRECUENCIA)
+# -------------------------------------------------------------------
+# El circuito se plantea por análisis nodal modificado (MNA) como
+# (G + s·Cm)·x = b, con G y Cm constantes. En lugar de resolver un sistema
+# por frecuencia, se diagonaliza una sola vez G⁻¹·Cm = V·diag(λ)·V⁻¹ y la
+# salida queda como suma de términos de primer orden:
+#
+#   H(s) = Σ r_k / (1 + s·λ_k)
+#
+# que se evalúa para todas las frecuencias con operaciones de numpy, en
+# O(frecuencias · nodos). Si la diagonalización no es confiable (matriz
+# mal condicionada), se resuelve frecuencia por frecuencia en bloques.
+
+GMIN = 1e-12          # Conductancia mínima a masa (como en SPICE) para nodos flotantes
+BLOQUE_AC = 65536     # Frecuencias por bloque, para acotar la memoria usada
+MAX_COND_AUTOVECTORES = 1e10
+MATRIZ_SINGULAR = ("El sistema del circuito no tiene solución única (¿una fuente de "
+                   "tensión en lazo con un inductor o con otra fuente?).")
+
+
+def netlist_rc(R, C):
+    """Netlist del RC serie de la graficadora: fuente -> R -> C a masa."""
+    return [
+        ("voltage", "in", "0", 1.0),
+        ("res", "in", "vc", R),
+        ("cap", "vc", "0", C),
+    ]
+
+
+def netlist_asc(ruta):
+    """Lee un .asc de LTSpice (con el parser de herramientas/indice_corpus.py).
+
+    Devuelve el netlist y el conjunto de nodos con nombre (FLAG) distinto de masa.
+    """
+    sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "herramientas"))
+    from indice_corpus import parsear_asc
+
+    esquema = parsear_asc(Path(ruta).read_bytes())
+    netlist = []
+    for comp in esquema["componentes"]:
+        if len(comp.get("nodos", ())) == 2 and comp.get("valor_num") is not None:
+            netlist.append((comp["simbolo"], comp["nodos"][0], comp["nodos"][1], comp["valor_num"]))
+    etiquetados = {nombre for _, nombre in esquema["etiquetas"] if nombre != "0"}
+    return netlist, etiquetados
+
+
+def matrices_mna(netlist, nodo_referencia="0"):
+    """Arma G, Cm y b del sistema (G + s·Cm)·x = b.
+
+    La entrada es la primera fuente del netlist con amplitud 1 (V o A); el
+    resto de las fuentes se anulan. Devuelve también el índice de cada nodo.
+    """
+    fuentes = [c for c in netlist if c[0] in ("voltage", "current")]
+    if not fuentes:
+        raise ValueError("El netlist no tiene ninguna fuente para usar como entrada.")
+    nodos = sorted({n for c in netlist for n in c[1:3]} - {nodo_referencia})
+    indice = {n: i for i, n in enumerate(nodos)}
+    # Las fuentes de tensión y los inductores agregan su corriente como incógnita
+    ramas = [c for c in netlist if c[0] in ("voltage", "ind")]
+    tamano = len(nodos) + len(ramas)
+
+    G = np.zeros((tamano, tamano))
+    Cm = np.zeros((tamano, tamano))
+    b = np.zeros(tamano)
+    G[range(len(nodos)), range(len(nodos))] = GMIN
+
+    def estampar(matriz, n1, n2, valor):
+        a, c = indice.get(n1), indice.get(n2)
+        if a is not None:
+            matriz[a, a] += valor
+        if c is not None:
+            matriz[c, c] += valor
+        if a is not None and c is not None:
+            matriz[a, c] -= valor
+            matriz[c, a] -= valor
+
+    k = len(nodos)
+    for componente in netlist:
+        tipo, n1, n2, valor = componente
+        if tipo in ("voltage", "ind"):
+            for n, signo in ((n1, 1.0), (n2, -1.0)):
+                if n in indice:
+                    G[indice[n], k] = signo
+                    G[k, indice[n]] = signo
+            if tipo == "ind":
+                Cm[k, k] = -valor         # V(n1) - V(n2) - s·L·i = 0
+            elif componente is fuentes[0]:
+                b[k] = 1.0
+            k += 1
+        elif tipo == "res":
+            estampar(G, n1, n2, 1.0 / valor)
+        elif tipo == "cap":
+            estampar(Cm, n1, n2, valor)
+        elif tipo == "current" and componente is fuentes[0]:
+            # Corriente de 1 A que sale de n1 y entra en n2 (convención de SPICE)
+            if n1 in indice:
+                b[indice[n1]] -= 1.0
+            if n2 in indice:
+                b[indice[n2]] += 1.0
+    return G, Cm, b, indice
+
+
+def constante_tiempo(netlist, nodo_referencia="0"):
+    """τ = R_th · C del primer capacitor, con R_th vista desde sus bornes.
+
+    R_th se obtiene inyectando 1 A entre los bornes con las fuentes anuladas.
+    """
+    capacitor = next((c for c in netlist if c[0] == "cap"), None)
+    if capacitor is None:
+        raise ValueError("El circuito no tiene capacitores.")
+    G, _, _, indice = matrices_mna(netlist, nodo_referencia)
+    d = np.zeros(len(G))
+    _, n1, n2, valor = capacitor
+    if n1 in indice:
+        d[indice[n1]] += 1.0
+    if n2 in indice:
+        d[indice[n2]] -= 1.0
+    try:
+        R_th = d @ np.linalg.solve(G, d)
+    except np.linalg.LinAlgError as e:
+        raise ValueError(MATRIZ_SINGULAR) from e
+    if R_th * GMIN > 1e-3:
+        # Sólo GMIN lo conecta: pasa con los esquemáticos que tienen la
+        # llave dibujada abierta.
+        raise ValueError("El capacitor no tiene camino resistivo en este circuito "
+                         "(¿la llave está dibujada abierta?).")
+    return R_th * valor
+
+
+def respuesta_frecuencia(netlist, f, nodo_salida, nodo_referencia="0"):
+    """Transferencia compleja H(f) = V(nodo_salida) / entrada, para todo el vector f.
+
+    Si el netlist no tiene nodo "0" se usa nodo_referencia como masa.
+    """
+    with etapa("ensamblado"):
+        G, Cm, b, indice = matrices_mna(netlist, nodo_referencia)
+    if nodo_salida not in indice:
+        raise ValueError("El nodo de salida %r no está en el circuito." % nodo_salida)
+    salida = indice[nodo_salida]
+    s = 2j * np.pi * np.asarray(f, dtype=float)
+    H = np.empty(s.shape, dtype=complex)
+
+    with etapa("autovalores"):
+        try:
+            A = np.linalg.solve(G, Cm)
+        except np.linalg.LinAlgError as e:
+            raise ValueError(MATRIZ_SINGULAR) from e
+        lam, V = np.linalg.eig(A)
+        confiable = np.linalg.cond(V) < MAX_COND_AUTOVECTORES
+        if confiable:
+            r = V[salida, :] * np.linalg.solve(V, np.linalg.solve(G, b))
+
+    if confiable:
+        with etapa("evaluacion"):
+            for inicio in range(0, len(s), BLOQUE_AC):
+                bloque = s[inicio:inicio + BLOQUE_AC, None]
+                H[inicio:inicio + BLOQUE_AC] = (r / (1 + bloque * lam)).sum(axis=1)
+        return H
+
+    with etapa("solve"):
+        for inicio in range(0, len(s), BLOQUE_AC):
+            bloque = s[inicio:inicio + BLOQUE_AC, None, None]
+            Y = G + bloque * Cm
+            try:
+                x = np.linalg.solve(Y, np.broadcast_to(b[:, None], (len(Y), len(b), 1)))
+            except np.linalg.LinAlgError as e:
+                raise ValueError(MATRIZ_SINGULAR) from e
+            H[inicio:inicio + BLOQUE_AC] = x[:, salida, 0]
+    return H
+
+
+def analizar_ac(f, H):
+    """Frecuencia de corte a -3 dB, fase en el corte y retardo de grupo."""
+    modulo_db = 20 * np.log10(np.abs(H))
+    fase = np.unwrap(np.angle(H))
+    w = 2 * np.pi * f
+    retardo_grupo = -np.gradient(fase, w)
+
+    # Corte: donde la ganancia cae 3 dB por debajo del máximo. Se busca el
+    # primer cruce después del máximo (pasabajos) o, si no hay, el último
+    # antes del máximo (pasaaltos), interpolando en escala logarítmica.
+    nivel = modulo_db.max() - 3.0103
+    maximo = np.argmax(modulo_db)
+    debajo = np.flatnonzero(modulo_db < nivel)
+    despues, antes = debajo[debajo > maximo], debajo[debajo < maximo]
+    if len(despues):
+        i, j = despues[0] - 1, despues[0]
+    elif len(antes):
+        i, j = antes[-1], antes[-1] + 1
+    else:
+        i = j = None
+
+    if i is None:
+        f_corte = fase_corte = retardo_corte = np.nan
+    else:
+        log_f = np.log10(f)
+        fraccion = (nivel - modulo_db[i]) / (modulo_db[j] - modulo_db[i])
+        log_corte = log_f[i] + fraccion * (log_f[j] - log_f[i])
+        f_corte = 10 ** log_corte
+        fase_corte = np.interp(log_corte, log_f, fase)
+        retardo_corte = np.interp(log_corte, log_f, retardo_grupo)
+
+    return {
+        "modulo_db": modulo_db,
+        "fase": fase,
+        "retardo_grupo": retardo_grupo,
+        "f_corte": f_corte,
+        "fase_corte": fase_corte,
+        "retardo_corte": retardo_corte,
+    }
+
+
+# -------------------------------------------------------------------
+# GENERACIÓN DE GRÁFICOS
+# -------------------------------------------------------------------
+
+def decimar(*arreglos, maximo=MAX_PUNTOS_GRAFICO):
+    """Toma uno de cada N puntos para no dibujar más de 'maximo' por curva."""
+    with etapa("decimacion"):
+        paso = max(1, int(np.ceil(len(arreglos[0]) / maximo)))
+        return [a[::paso] for a in arreglos]
+
+
+def crear_figura(titulo_ventana, filas=1):
+    with etapa("figura"):
+        fig, ejes = plt.subplots(filas, 1, figsize=(12, 6), sharex=filas > 1)
+        fig.canvas.manager.set_window_title(titulo_ventana)
+    return fig, ejes
+
+
+def ajustar_layout(fig):
+    with etapa("layout"):
+        fig.tight_layout()
+
+
+def guardar_figuras(figuras, carpeta="."):
+    """Guarda cada figura como PNG con el nombre de su ventana (igual que el botón de guardar)."""
+    Path(carpeta).mkdir(parents=True, exist_ok=True)
+    for fig in figuras:
+        nombre = "_".join(fig.canvas.manager.get_window_title().split()) + ".png"
+        with etapa("guardar"):
+            fig.savefig(Path(carpeta) / nombre)
+
+
+def marcar_transiciones(ax, t_fin_carga, t_inicio_descarga):
+    ax.axvline(x=t_fin_carga, color='green', linestyle='--', label=f'Fin Carga (t={t_fin_carga}s)')
+    ax.axvline(x=t_inicio_descarga, color='orange', linestyle='--', label=f'Inicio Descarga (t={t_inicio_descarga}s)')
+
+
+def graficar_vc(ciclo, Vf, t_fin_carga, t_inicio_descarga):
+    """Ventana 1: Gráfico de Tensión en Capacitor (vc)."""
+    t, vc = decimar(ciclo["t"], ciclo["vc"])
+    fig_vc, ax_vc = crear_figura('Ciclo Completo - Tensión en Capacitor (vc)')
+    with etapa("artistas"):
+        ax_vc.plot(t, vc, 'b-', label='Tensión en Capacitor (vc)')
+        ax_vc.set_title('Tensión en Capacitor (vc)')
+        ax_vc.set_xlabel('Tiempo (s)'); ax_vc.set_ylabel('Tensión (V)')
+        ax_vc.grid(True); ax_vc.set_ylim(bottom=0, top=Vf * 1.1); ax_vc.set_xlim(left=0)
+        marcar_transiciones(ax_vc, t_fin_carga, t_inicio_descarga)
+        ax_vc.legend()
+    ajustar_layout(fig_vc)
+    return fig_vc
+
+
+def graficar_ic(ciclo, Vf, t_fin_carga, t_inicio_descarga):
+    """Ventana 2: Gráfico de Corriente (ic)."""
+    t, ic = decimar(ciclo["t"], ciclo["ic"])
+    fig_ic, ax_ic = crear_figura('Ciclo Completo - Corriente (ic)')
+    with etapa("artistas"):
+        ax_ic.plot(t, ic, 'r-', label='Corriente (ic)')
+        ax_ic.set_title('Corriente en el Circuito (ic)')
+        ax_ic.set_xlabel('Tiempo (s)'); ax_ic.set_ylabel('Corriente (A)')
+        ax_ic.grid(True); ax_ic.set_xlim(left=0)
+        ax_ic.axhline(y=0, color='black', linewidth=0.5)
+        marcar_transiciones(ax_ic, t_fin_carga, t_inicio_descarga)
+        ax_ic.legend()
+    ajustar_layout(fig_ic)
+    return fig_ic
+
+
+def graficar_vr(ciclo, Vf, t_fin_carga, t_inicio_descarga):
+    """Ventana 3: Gráfico de Tensión en Resistor (vr)."""
+    t, vr = decimar(ciclo["t"], ciclo["vr"])
+    fig_vr, ax_vr = crear_figura('Ciclo Completo - Tensión en Resistor (vr)')
+    with etapa("artistas"):
+        ax_vr.plot(t, vr, 'g-', label='Tensión en Resistor (vr)')
+        ax_vr.set_title('Tensión en Resistor (vr)')
+        ax_vr.set_xlabel('Tiempo (s)'); ax_vr.set_ylabel('Tensión (V)')
+        ax_vr.grid(True); ax_vr.set_xlim(left=0)
+        # Eje Y simétrico para que se vean los valores positivos y negativos
+        max_vr_abs = max(abs(ciclo["vr"].min()), abs(ciclo["vr"].max()))
+        ax_vr.set_ylim(-max_vr_abs * 1.1, max_vr_abs * 1.1)
+        ax_vr.axhline(y=0, color='black', linewidth=0.5)
+        marcar_transiciones(ax_vr, t_fin_carga, t_inicio_descarga)
+        ax_vr.legend()
+    ajustar_layout(fig_vr)
+    return fig_vr
+
+
+GRAFICOS_CICLO = {"vc": graficar_vc, "ic": graficar_ic, "vr": graficar_vr}
+
+
+def graficar_ciclo(ciclo, Vf, t_fin_carga, t_inicio_descarga):
+    """Las tres ventanas del dominio del tiempo: vc, ic y vr."""
+    return [graficar(ciclo, Vf, t_fin_carga, t_inicio_descarga) for graficar in GRAFICOS_CICLO.values()]
+
+
+def graficar_bode(f, analisis, titulo):
+    """Ventana con módulo (dB) y fase (grados) en escala logarítmica."""
+    f_dib, modulo, fase = decimar(f, analisis["modulo_db"], np.degrees(analisis["fase"]))
+    f_corte = analisis["f_corte"]
+
+    fig, (ax_mod, ax_fase) = crear_figura(f'Respuesta en Frecuencia - {titulo}', filas=2)
+    with etapa("artistas"):
+        ax_mod.semilogx(f_dib, modulo, 'b-', label='|H| (dB)')
+        ax_mod.set_title(f'Diagrama de Bode - {titulo}')
+        ax_mod.set_ylabel('Ganancia (dB)'); ax_mod.grid(True, which='both')
+        ax_fase.semilogx(f_dib, fase, 'r-', label='Fase (°)')
+        ax_fase.set_xlabel('Frecuencia (Hz)'); ax_fase.set_ylabel('Fase (°)')
+        ax_fase.grid(True, which='both')
+        if np.isfinite(f_corte):
+            for ax in (ax_mod, ax_fase):
+                ax.axvline(x=f_corte, color='green', linestyle='--', label=f'Corte -3 dB (f={f_corte:.4g} Hz)')
+        ax_mod.legend(); ax_fase.legend()
+    ajustar_layout(fig)
+    return [fig]
+
+
+def ejecutar_ac():
+    """Arma el netlist, calcula la respuesta en frecuencia e imprime el resumen."""
+    with etapa("parametros"):
+        netlist, salida, referencia, titulo, fc_estimada = _parametros_ac()
+        f_min = fc_estimada / 1000 if F_MIN is None else F_MIN
+        f_max = fc_estimada * 1000 if F_MAX is None else F_MAX
+        if not 0 < f_min < f_max < np.inf:
+            raise ValueError("Se necesita 0 < F_MIN < F_MAX.")
+        f = np.logspace(np.log10(f_min), np.log10(f_max), N_PUNTOS_AC)
+
+    with etapa("calculo"):
+        H = respuesta_frecuencia(netlist, f, salida, referencia)
+    if not np.any(np.abs(H) > 0):
+        # Pasa con los esquemáticos que tienen la llave dibujada abierta.
+        print(f"Error: la salida V({salida}) no está conectada a la fuente en este circuito.")
+        return []
+    with etapa("analisis"):
+        analisis = analizar_ac(f, H)
+
+    print(f"Frecuencia de corte (-3 dB): {analisis['f_corte']:.6g} Hz")
+    print(f"Frecuencia de corte estimada 1/(2πτ): {fc_estimada:.6g} Hz")
+    print(f"Fase en el corte: {np.degrees(analisis['fase_corte']):.4g}°")
+    print(f"Retardo de grupo en el corte: {analisis['retardo_corte']:.6g} s")
+    with etapa("graficos"):
+        return graficar_bode(f, analisis, titulo)
+
+
+def _parametros_ac():
+    if ASC:
+        ruta = Path(__file__).resolve().parent / ASC
+        netlist, etiquetados = netlist_asc(ruta)
+        fuente = next((c for c in netlist if c[0] in ("voltage", "current")), None)
+        capacitor = next((c for c in netlist if c[0] == "cap"), None)
+        if fuente is None or capacitor is None:
+            raise ValueError(f"{ruta.name} no tiene una fuente y un capacitor para analizar.")
+        referencia = "0" if any("0" in c[1:3] for c in netlist) else fuente[2]
+        # Salida: la configurada, si no un nodo con nombre (FLAG) y si no el
+        # borne del capacitor que no es la masa.
+        salida = NODO_SALIDA or next(iter(sorted(etiquetados)), None) \
+            or (capacitor[1] if capacitor[1] != referencia else capacitor[2])
+        titulo = f'{ruta.stem} (V({salida}))'
+        tau = constante_tiempo(netlist, referencia)
+    else:
+        netlist = netlist_rc(R_carga, C)
+        salida, referencia = "vc", "0"
+        titulo = 'RC de carga (vc)'
+        tau = R_carga * C
+    if not 0 < tau < np.inf:
+        raise ValueError("La constante de tiempo R·C tiene que ser un número finito mayor que cero.")
+    return netlist, salida, referencia, titulo, 1 / (2 * np.pi * tau)
+
+
+def ejecutar_tiempo():
+    with etapa("calculo"):
+        ciclo = calcular_ciclo(Vf, Vi, C, R_carga, R_descarga, t_fin_carga, t_inicio_descarga)
+    with etapa("graficos"):
+        return graficar_ciclo(ciclo, Vf, t_fin_carga, t_inicio_descarga)
+
+
+if __name__ == "__main__":
+    argumentos = [a for a in sys.argv[1:] if not a.startswith("--")]
+    opciones = {a for a in sys.argv[1:] if a.startswith("--")}
+    modo = argumentos[0] if argumentos else MODO
+    perfilar = PERFILAR or "--perfilar" in opciones
+    carpeta = Path(__file__).resolve().parent
+
+    if modo not in ("tiempo", "ac", "ambos"):
+        print(f"Error: modo desconocido {modo!r} (tiene que ser tiempo, ac o ambos).")
+        sys.exit()
+
+    if perfilar:
+        instrumentacion.activar(memoria=PERFILAR_MEMORIA or "--memoria" in opciones)
+
+    figuras = []
+    try:
+        with etapa("graficadora"):
+            if modo in ("tiempo", "ambos"):
+                with etapa("tiempo"):
+                    try:
+                        figuras += ejecutar_tiempo()
+                    except ValueError as e:
+                        print("Error:", e)
+                        sys.exit()
+
+            if modo in ("ac", "ambos"):
+                with etapa("ac"):
+                    try:
+                        figuras += ejecutar_ac()
+                    except ValueError as e:
+                        print("Error:", e)
+
+            if GUARDAR or "--guardar" in opciones:
+                guardar_figuras(figuras, carpeta / "salida")
+    finally:
+        # También cuando la corrida termina por un error, así queda el perfil
+        if perfilar:
+            instrumentacion.exportar_json(carpeta / "perfil_graficadora.json")
+            instrumentacion.exportar_colapsado(carpeta / "perfil_graficadora.folded")
+            instrumentacion.imprimir_resumen()
+            instrumentacion.desactivar()
+
+    # Mostrar todas las ventanas
+    plt.show()
@@ -0,0 +1,155 @@
+import json
+import time
+import tracemalloc
+
+# -------------------------------------------------------------------
+# INSTRUMENTACIÓN DE LA GRAFICADORA
+# -------------------------------------------------------------------
+# Mide cuánto tarda cada etapa (parámetros, cálculo de cada fase,
+# decimación, creación de artistas, layout y guardado), cuántas veces se
+# llama y, opcionalmente, cuánta memoria reserva (con tracemalloc).
+#
+# Uso:
+#   with etapa("calculo"):
+#       ...
+# Mientras no se llame a activar(), etapa() devuelve siempre el mismo
+# objeto vacío, así que el costo es el de un 'with' sin nada adentro.
+#
+# Los resultados se exportan como JSON o como "collapsed stacks" (una
+# línea "a;b;c microsegundos" por etapa), el formato que leen
+# flamegraph.pl, speedscope o inferno para dibujar un flame graph.
+
+_activo = False
+_memoria = False
+_pila = []
+_datos = {}
+
+
+class _EtapaNula:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *excepcion):
+        return False
+
+
+_NULA = _EtapaNula()
+
+
+def _registro(ruta):
+    registro = _datos.get(ruta)
+    if registro is None:
+        registro = _datos[ruta] = {"llamadas": 0, "ns": 0, "ns_hijos": 0,
+                                   "bytes_netos": 0, "bytes_pico": 0}
+    return registro
+
+
+class _Etapa:
+    __slots__ = ("nombre", "inicio", "memoria_inicio", "pico")
+
+    def __init__(self, nombre):
+        self.nombre = nombre
+
+    def __enter__(self):
+        if _memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            # El pico de tracemalloc es global: antes de reiniciarlo para
+            # esta etapa se le pasa a la etapa de arriba lo que llevaba.
+            if _pila:
+                _pila[-1].pico = max(_pila[-1].pico, pico)
+            tracemalloc.reset_peak()
+            self.memoria_inicio = self.pico = actual
+        _pila.append(self)
+        self.inicio = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *excepcion):
+        duracion = time.perf_counter_ns() - self.inicio
+        ruta = tuple(e.nombre for e in _pila)
+        _pila.pop()
+
+        registro = _registro(ruta)
+        registro["llamadas"] += 1
+        registro["ns"] += duracion
+
+        if _memoria:
+            actual, pico = tracemalloc.get_traced_memory()
+            pico = max(self.pico, pico)
+            registro["bytes_netos"] += actual - self.memoria_inicio
+            registro["bytes_pico"] = max(registro["bytes_pico"], pico - self.memoria_inicio)
+            if _pila:
+                _pila[-1].pico = max(_pila[-1].pico, pico)
+
+        if _pila:
+            _registro(ruta[:-1])["ns_hijos"] += duracion
+        return False
+
+
+def etapa(nombre):
+    """Context manager que mide la etapa 'nombre' (no hace nada si está desactivado)."""
+    if not _activo:
+        return _NULA
+    return _Etapa(nombre)
+
+
+def activar(memoria=False):
+    """Empieza a medir. Con memoria=True también se cuentan los bytes reservados."""
+    global _activo, _memoria
+    _datos.clear()
+    _activo = True
+    _memoria = memoria
+    if memoria and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def desactivar():
+    global _activo, _memoria
+    _activo = False
+    if _memoria and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _memoria = False
+
+
+def activo():
+    return _activo
+
+
+def resultados():
+    """Lista de etapas con tiempo total y propio (sin las subetapas), en ms."""
+    filas = []
+    for ruta, r in sorted(_datos.items()):
+        filas.append({
+            "etapa": ";".join(ruta),
+            "llamadas": r["llamadas"],
+            "total_ms": r["ns"] / 1e6,
+            "propio_ms": (r["ns"] - r["ns_hijos"]) / 1e6,
+            "bytes_netos": r["bytes_netos"],
+            "bytes_pico": r["bytes_pico"],
+        })
+    return filas
+
+
+def exportar_json(ruta):
+    with open(ruta, "w", encoding="utf-8") as f:
+        json.dump({"memoria": _memoria, "etapas": resultados()}, f, ensure_ascii=False, indent=2)
+
+
+def exportar_colapsado(ruta):
+    # Cada línea lleva el tiempo propio de la etapa en microsegundos, así el
+    # ancho de una etapa en el flame graph es la suma de sus subetapas.
+    with open(ruta, "w", encoding="utf-8") as f:
+        for ruta_etapa, r in sorted(_datos.items()):
+            propio = (r["ns"] - r["ns_hijos"]) // 1000
+            if propio > 0:
+                f.write("%s %d\n" % (";".join(ruta_etapa), propio))
+
+
+def imprimir_resumen():
+    print(f"{'Etapa':<45} {'Llamadas':>8} {'Total (ms)':>11} {'Propio (ms)':>12} {'Pico (KiB)':>11}")
+    for fila in resultados():
+        nivel = fila["etapa"].count(";")
+        nombre = "  " * nivel + fila["etapa"].rsplit(";", 1)[-1]
+        print(f"{nombre:<45} {fila['llamadas']:>8} {fila['total_ms']:>11.3f} "
+              f"{fila['propio_ms']:>12.3f} {fila['bytes_pico'] / 1024:>11.1f}")
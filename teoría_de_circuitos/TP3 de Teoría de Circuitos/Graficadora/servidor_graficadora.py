@@ -0,0 +1,425 @@
+import asyncio
+import json
+import math
+import multiprocessing
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import parse_qs, urlsplit
+
+import matplotlib
+matplotlib.use("Agg")  # Sin ventanas: las imágenes se generan en memoria
+import matplotlib.pyplot as plt
+import numpy as np
+
+import graficadorav4 as g
+
+# -------------------------------------------------------------------
+# SERVIDOR LOCAL DE LA GRAFICADORA
+# -------------------------------------------------------------------
+# Mantiene Python, numpy y matplotlib ya cargados y atiende pedidos HTTP
+# con los parámetros del circuito. Devuelve las curvas en JSON o el
+# gráfico en PNG/SVG.
+#
+#   python servidor_graficadora.py                    -> http://127.0.0.1:8765
+#   python servidor_graficadora.py 9000               -> otro puerto
+#   python servidor_graficadora.py --unix /tmp/graf.sock
+#
+# Pedidos (los parámetros van en el cuerpo como JSON o en la URL):
+#   POST /ciclo?formato=json            {"Vf": 30, "C": 2e-6, ...}
+#   POST /ciclo?formato=png&grafico=ic  {...}
+#   POST /ac?formato=svg                {"R_carga": 5000, "C": 2e-6}
+#   GET  /estado                        -> estadísticas del caché
+#
+# En formato JSON las curvas se devuelven con a lo sumo MAX_PUNTOS_JSON
+# puntos (se toma uno de cada N); f_corte y demás valores se calculan con
+# todos los puntos pedidos.
+#
+# - Los cálculos corren en un pool de hilos y los gráficos en un pool de
+#   procesos, para no trabar el bucle de asyncio.
+# - Pedidos idénticos que llegan mientras otro igual se está calculando
+#   esperan ese mismo resultado en lugar de repetir el trabajo.
+# - Las respuestas terminadas quedan en un caché LRU acotado en bytes.
+
+HOST = "127.0.0.1"
+PUERTO = 8765
+HILOS_CALCULO = 4
+PROCESOS_GRAFICO = 2
+MAX_BYTES_CACHE = 64 * 1024 * 1024
+
+# Parámetros aceptados por cada ruta, con su valor por defecto (los de la
+# graficadora v4). Cualquier otro parámetro es un error.
+PARAMETROS = {
+    "/ciclo": {
+        "Vf": g.Vf, "Vi": g.Vi, "C": g.C, "R_carga": g.R_carga, "R_descarga": g.R_descarga,
+        "t_fin_carga": g.t_fin_carga, "t_inicio_descarga": g.t_inicio_descarga,
+        "n_puntos": 2000,
+    },
+    "/ac": {
+        "R_carga": g.R_carga, "C": g.C, "f_min": None, "f_max": None,
+        "n_puntos": g.N_PUNTOS_AC,
+    },
+}
+FORMATOS = {"json": "application/json", "png": "image/png", "svg": "image/svg+xml"}
+MAX_PUNTOS = 10 ** 6
+MAX_PUNTOS_JSON = 20000
+MAX_BYTES_CUERPO = 64 * 1024
+MAX_ENCABEZADOS = 100
+
+
+class ErrorPedido(Exception):
+    """Pedido mal formado: se responde con 400 y el mensaje."""
+
+
+class RutaDesconocida(ErrorPedido):
+    """Se responde con 404."""
+
+
+def canonizar(ruta, consulta, cuerpo):
+    """Normaliza un pedido a (parámetros, formato, gráfico, clave del caché).
+
+    Los valores se pasan a float (o int para n_puntos) y se completan con
+    los de por defecto, así {"C": 2e-6} y {"C": "0.000002"} dan la misma clave.
+    """
+    if ruta not in PARAMETROS:
+        raise RutaDesconocida("Ruta desconocida: %s" % ruta)
+    pedido = {k: v[-1] for k, v in consulta.items()}
+    if cuerpo:
+        try:
+            datos = json.loads(cuerpo)
+        except ValueError as e:
+            raise ErrorPedido("JSON inválido: %s" % e)
+        if not isinstance(datos, dict):
+            raise ErrorPedido("El cuerpo tiene que ser un objeto JSON.")
+        pedido.update(datos)
+
+    formato = str(pedido.pop("formato", "json")).lower()
+    if formato not in FORMATOS:
+        raise ErrorPedido("Formato desconocido: %s" % formato)
+    grafico = str(pedido.pop("grafico", "vc"))
+    if ruta == "/ciclo" and grafico not in g.GRAFICOS_CICLO:
+        raise ErrorPedido("Gráfico desconocido: %s" % grafico)
+    if ruta == "/ac" or formato == "json":
+        grafico = None
+
+    defecto = PARAMETROS[ruta]
+    desconocidos = set(pedido) - set(defecto)
+    if desconocidos:
+        raise ErrorPedido("Parámetros desconocidos: %s" % ", ".join(sorted(desconocidos)))
+
+    parametros = {}
+    for nombre, valor in defecto.items():
+        valor = pedido.get(nombre, valor)
+        if valor is None:
+            parametros[nombre] = None
+            continue
+        try:
+            if isinstance(valor, bool):
+                raise TypeError
+            numero = float(valor)
+        except (TypeError, ValueError):
+            raise ErrorPedido("Valor inválido para %s: %r" % (nombre, valor))
+        if not math.isfinite(numero):
+            raise ErrorPedido("%s tiene que ser un número finito." % nombre)
+        if nombre == "n_puntos":
+            if not numero.is_integer():
+                raise ErrorPedido("n_puntos tiene que ser un número entero.")
+            numero = int(numero)
+        parametros[nombre] = numero
+    if not 2 <= parametros["n_puntos"] <= MAX_PUNTOS:
+        raise ErrorPedido("n_puntos tiene que estar entre 2 y %d." % MAX_PUNTOS)
+
+    clave = json.dumps([ruta, formato, grafico, parametros], sort_keys=True)
+    return parametros, formato, grafico, clave
+
+
+# -------------------------------------------------------------------
+# CÁLCULO (pool de hilos) Y GRÁFICOS (pool de procesos)
+# -------------------------------------------------------------------
+
+def calcular(ruta, p):
+    if ruta == "/ciclo":
+        return g.calcular_ciclo(p["Vf"], p["Vi"], p["C"], p["R_carga"], p["R_descarga"],
+                                p["t_fin_carga"], p["t_inicio_descarga"], p["n_puntos"])
+
+    if p["R_carga"] <= 0 or p["C"] <= 0:
+        raise ValueError("La capacitancia y la resistencia tienen que ser mayores que cero.")
+    tau = p["R_carga"] * p["C"]
+    fc = 1 / (2 * np.pi * tau) if tau > 0 else np.inf
+    if not 0 < fc < np.inf or not 0 < tau < np.inf:
+        raise ValueError("La constante de tiempo R·C y la frecuencia de corte tienen "
+                         "que ser números finitos mayores que cero.")
+    f_min = fc / 1000 if p["f_min"] is None else p["f_min"]
+    f_max = fc * 1000 if p["f_max"] is None else p["f_max"]
+    if not 0 < f_min < f_max < np.inf:
+        raise ValueError("Se necesita 0 < f_min < f_max.")
+    f = np.logspace(np.log10(f_min), np.log10(f_max), p["n_puntos"])
+    H = g.respuesta_frecuencia(g.netlist_rc(p["R_carga"], p["C"]), f, "vc")
+    analisis = g.analizar_ac(f, H)
+    analisis["f"] = f
+    return analisis
+
+
+def a_json(ruta, resultado):
+    if ruta == "/ciclo":
+        curvas, escalares = ("t", "vc", "ic", "vr"), ("V_fin_carga",)
+    else:
+        curvas = ("f", "modulo_db", "fase", "retardo_grupo")
+        escalares = ("f_corte", "fase_corte", "retardo_corte")
+    datos = {}
+    reducidas = g.decimar(*(resultado[c] for c in curvas), maximo=MAX_PUNTOS_JSON)
+    for clave, valores in zip(curvas, reducidas):
+        # Los valores no finitos (ej: fase de |H| = 0) van como null
+        datos[clave] = np.where(np.isfinite(valores), valores, None).tolist()
+    for clave in escalares:
+        valor = resultado[clave]
+        datos[clave] = float(valor) if np.isfinite(valor) else None
+    return json.dumps(datos).encode("utf-8")
+
+
+def renderizar(ruta, resultado, p, formato, grafico):
+    """Corre en el pool de procesos: dibuja la figura y la devuelve como bytes."""
+    if ruta == "/ciclo":
+        fig = g.GRAFICOS_CICLO[grafico](resultado, p["Vf"], p["t_fin_carga"], p["t_inicio_descarga"])
+    else:
+        fig = g.graficar_bode(resultado["f"], resultado, 'RC de carga (vc)')[0]
+    salida = BytesIO()
+    fig.savefig(salida, format=formato)
+    plt.close(fig)
+    return salida.getvalue()
+
+
+def _preparar():
+    # No hace nada: alcanza con que el proceso arranque e importe este
+    # módulo (matplotlib y la graficadora) antes del primer pedido.
+    return None
+
+
+def reducir_para_grafico(ruta, resultado):
+    # Al proceso que dibuja sólo le hacen falta los puntos que se van a
+    # dibujar, así se copian menos datos entre procesos.
+    if ruta == "/ciclo":
+        t, vc, ic, vr = g.decimar(resultado["t"], resultado["vc"], resultado["ic"], resultado["vr"])
+        return dict(resultado, t=t, vc=vc, ic=ic, vr=vr)
+    f, modulo_db, fase = g.decimar(resultado["f"], resultado["modulo_db"], resultado["fase"])
+    return dict(resultado, f=f, modulo_db=modulo_db, fase=fase, retardo_grupo=None)
+
+
+# -------------------------------------------------------------------
+# CACHÉ LRU Y AGRUPAMIENTO DE PEDIDOS
+# -------------------------------------------------------------------
+
+class Graficadora:
+    def __init__(self, max_bytes=MAX_BYTES_CACHE):
+        self.max_bytes = max_bytes
+        self.cache = OrderedDict()   # clave -> (tipo de contenido, cuerpo)
+        self.bytes_cache = 0
+        self.en_curso = {}           # clave -> asyncio.Future
+        self.estadisticas = {"aciertos": 0, "fallos": 0, "agrupados": 0, "errores": 0}
+        self.hilos = ThreadPoolExecutor(HILOS_CALCULO)
+        # "spawn" porque el proceso ya tiene hilos corriendo (fork no es seguro)
+        self.procesos = ProcessPoolExecutor(PROCESOS_GRAFICO,
+                                            mp_context=multiprocessing.get_context("spawn"))
+
+    async def calentar(self):
+        bucle = asyncio.get_running_loop()
+        await asyncio.gather(*(bucle.run_in_executor(self.procesos, _preparar)
+                               for _ in range(PROCESOS_GRAFICO)))
+
+    def cerrar(self):
+        self.hilos.shutdown()
+        self.procesos.shutdown()
+
+    def _guardar(self, clave, respuesta):
+        tamano = len(respuesta[1])
+        if tamano > self.max_bytes:
+            return
+        self.cache[clave] = respuesta
+        self.bytes_cache += tamano
+        while self.bytes_cache > self.max_bytes:
+            _, (_, viejo) = self.cache.popitem(last=False)
+            self.bytes_cache -= len(viejo)
+
+    async def resolver(self, ruta, consulta, cuerpo):
+        """Devuelve (tipo de contenido, cuerpo) para un pedido."""
+        parametros, formato, grafico, clave = canonizar(ruta, consulta, cuerpo)
+
+        respuesta = self.cache.get(clave)
+        if respuesta is not None:
+            self.cache.move_to_end(clave)
+            self.estadisticas["aciertos"] += 1
+            return respuesta
+
+        pendiente = self.en_curso.get(clave)
+        if pendiente is not None:
+            self.estadisticas["agrupados"] += 1
+            return await asyncio.shield(pendiente)
+
+        self.estadisticas["fallos"] += 1
+        pendiente = asyncio.get_running_loop().create_future()
+        self.en_curso[clave] = pendiente
+        try:
+            respuesta = await self._producir(ruta, parametros, formato, grafico)
+        except BaseException as e:
+            pendiente.set_exception(e)
+            # Si nadie más esperaba, se marca la excepción como vista.
+            pendiente.exception()
+            raise
+        else:
+            self._guardar(clave, respuesta)
+            pendiente.set_result(respuesta)
+            return respuesta
+        finally:
+            del self.en_curso[clave]
+
+    async def _producir(self, ruta, parametros, formato, grafico):
+        bucle = asyncio.get_running_loop()
+        resultado = await bucle.run_in_executor(self.hilos, calcular, ruta, parametros)
+        if formato == "json":
+            cuerpo = await bucle.run_in_executor(self.hilos, a_json, ruta, resultado)
+        else:
+            reducido = reducir_para_grafico(ruta, resultado)
+            cuerpo = await bucle.run_in_executor(self.procesos, renderizar, ruta, reducido,
+                                                 parametros, formato, grafico)
+        return FORMATOS[formato], cuerpo
+
+    def estado(self):
+        return dict(self.estadisticas, entradas=len(self.cache), bytes=self.bytes_cache,
+                    en_curso=len(self.en_curso))
+
+
+# -------------------------------------------------------------------
+# HTTP MÍNIMO SOBRE asyncio
+# -------------------------------------------------------------------
+
+ESTADOS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class ErrorHTTP(Exception):
+    """Pedido HTTP ilegible: se responde con el código y se cierra la conexión."""
+
+    def __init__(self, codigo, mensaje):
+        super().__init__(mensaje)
+        self.codigo = codigo
+
+
+async def leer_pedido(lector):
+    """Lee un pedido HTTP/1.x. Devuelve None si el cliente cerró la conexión."""
+    try:
+        linea = await lector.readline()
+        if not linea:
+            return None
+        try:
+            metodo, objetivo, version = linea.decode("latin-1").split()
+        except ValueError:
+            raise ErrorHTTP(400, "Pedido inválido")
+
+        encabezados = {}
+        while True:
+            linea = await lector.readline()
+            if linea in (b"\r\n", b"\n", b""):
+                break
+            if len(encabezados) >= MAX_ENCABEZADOS:
+                raise ErrorHTTP(400, "Demasiados encabezados")
+            nombre, _, valor = linea.decode("latin-1").partition(":")
+            encabezados[nombre.strip().lower()] = valor.strip()
+    except ValueError:
+        # readline() falla así cuando la línea supera el límite del lector
+        raise ErrorHTTP(400, "Línea demasiado larga")
+
+    try:
+        largo = int(encabezados.get("content-length") or 0)
+    except ValueError:
+        raise ErrorHTTP(400, "Content-Length inválido")
+    if largo < 0:
+        raise ErrorHTTP(400, "Content-Length inválido")
+    if largo > MAX_BYTES_CUERPO:
+        raise ErrorHTTP(413, "El cuerpo no puede superar %d bytes" % MAX_BYTES_CUERPO)
+    cuerpo = await lector.readexactly(largo) if largo else b""
+    return metodo, objetivo, version, encabezados, cuerpo
+
+
+async def responder(escritor, codigo, tipo, cuerpo, mantener):
+    encabezado = ("HTTP/1.1 %d %s\r\nContent-Type: %s\r\nContent-Length: %d\r\n"
+                  "Connection: %s\r\n\r\n" % (codigo, ESTADOS[codigo], tipo, len(cuerpo),
+                                                "keep-alive" if mantener else "close"))
+    escritor.write(encabezado.encode("ascii") + cuerpo)
+    await escritor.drain()
+
+
+def error_json(mensaje):
+    return json.dumps({"error": mensaje}, ensure_ascii=False).encode("utf-8")
+
+
+async def atender(servicio, lector, escritor):
+    try:
+        while True:
+            try:
+                pedido = await leer_pedido(lector)
+            except ErrorHTTP as e:
+                await responder(escritor, e.codigo, FORMATOS["json"], error_json(str(e)), False)
+                break
+            if pedido is None:
+                break
+            metodo, objetivo, version, encabezados, cuerpo = pedido
+            mantener = (version == "HTTP/1.1"
+                        and encabezados.get("connection", "").lower() != "close")
+
+            url = urlsplit(objetivo)
+            inicio = time.perf_counter()
+            if url.path == "/estado":
+                codigo, tipo = 200, FORMATOS["json"]
+                contenido = json.dumps(servicio.estado()).encode("utf-8")
+            elif metodo not in ("GET", "POST"):
+                codigo, tipo, contenido = 405, FORMATOS["json"], error_json("Método no permitido")
+            else:
+                try:
+                    tipo, contenido = await servicio.resolver(url.path, parse_qs(url.query), cuerpo)
+                    codigo = 200
+                except RutaDesconocida as e:
+                    codigo, tipo, contenido = 404, FORMATOS["json"], error_json(str(e))
+                except ErrorPedido as e:
+                    codigo, tipo, contenido = 400, FORMATOS["json"], error_json(str(e))
+                except ValueError as e:
+                    # Errores de validación de la graficadora (tiempos, valores, etc.)
+                    servicio.estadisticas["errores"] += 1
+                    codigo, tipo, contenido = 400, FORMATOS["json"], error_json(str(e))
+                except Exception as e:
+                    servicio.estadisticas["errores"] += 1
+                    codigo, tipo, contenido = 500, FORMATOS["json"], error_json(repr(e))
+            await responder(escritor, codigo, tipo, contenido, mantener)
+            print("%s %s %d %.2f ms" % (metodo, objetivo, codigo, (time.perf_counter() - inicio) * 1000), flush=True)
+            if not mantener:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        escritor.close()
+
+
+async def principal(argumentos):
+    servicio = Graficadora()
+    await servicio.calentar()
+    manejador = lambda lector, escritor: atender(servicio, lector, escritor)
+    if argumentos[:1] == ["--unix"]:
+        servidor = await asyncio.start_unix_server(manejador, path=argumentos[1])
+        print("Escuchando en el socket", argumentos[1], flush=True)
+    else:
+        puerto = int(argumentos[0]) if argumentos else PUERTO
+        servidor = await asyncio.start_server(manejador, HOST, puerto)
+        print("Escuchando en http://%s:%d" % (HOST, puerto), flush=True)
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        servicio.cerrar()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(principal(sys.argv[1:]))
+    except KeyboardInterrupt:
+        pass